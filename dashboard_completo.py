@@ -4,6 +4,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import requests
 from PIL import Image
@@ -23,9 +24,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Limpiar cache
-st.cache_data.clear()
-
 # Cargar logo
 @st.cache_data
 def load_logo(url):
@@ -57,63 +55,235 @@ with col_icon:
 
 st.markdown("---")
 
-@st.cache_data(ttl=300, show_spinner="Cargando datos desde Google Sheets...")
-def load_data():
-    """Cargar datos desde Google Sheets"""
+def leer_secret(clave, default):
+    """Leer una clave de .streamlit/secrets.toml (valor por defecto si no hay secrets o no existe la clave)"""
     try:
-        # Sheet ID (la parte larga después de /d/)
-        sheet_id = "17eEYewfzoBZXkFWBm5DOJp3IuvHg9WvN"
-        
-        # URLs CORREGIDAS - formato de exportación directa
-        ot_master_csv = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=22353124"
-        procesos_csv = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=1564553976"
-        
-        # Cargar datos
-        ot_master = pd.read_csv(ot_master_csv)
-        procesos = pd.read_csv(procesos_csv)
-        
-        return ot_master, procesos
-    except Exception as e:
-        st.error(f"Error al cargar los datos desde Google Sheets: {e}")
-        return None, None
+        return st.secrets[clave]
+    except (FileNotFoundError, KeyError):
+        return default
+
+# Estatus conocidos de OT Master: True si la OT se considera completada (no se marca como vencida).
+# Se pueden redefinir con la tabla [estatus] en .streamlit/secrets.toml, ej: "EN PROCESO" = false
+estatus_default = {
+    'EN PROCESO': False,
+    'FACTURADO': True,
+    'OK': True,
+    'OK NO ENTREGADO': True,
+}
+estatus_conocidos = dict(leer_secret("estatus", estatus_default))
+
+# Estatus reconocidos en OT Master (cualquier otro valor va a cuarentena)
+estatus_validos = list(estatus_conocidos)
+
+# Definir estados que NO se consideran vencidos
+estados_no_vencidos = [estatus for estatus, completada in estatus_conocidos.items() if completada]
+
+# Fuentes de datos: un libro de Google Sheets (OT Master + Procesos) por planta/línea.
+# Se pueden definir otras fuentes con la lista [[fuentes]] en .streamlit/secrets.toml
+fuentes_default = [
+    {
+        'planta': 'Adimatec',
+        'sheet_id': "17eEYewfzoBZXkFWBm5DOJp3IuvHg9WvN",  # La parte larga después de /d/
+        'gid_ot_master': "22353124",
+        'gid_procesos': "1564553976",
+    },
+]
+
+claves_fuente = ['planta', 'sheet_id', 'gid_ot_master', 'gid_procesos']
+
+def obtener_fuentes():
+    """Obtener la lista de fuentes configuradas (secrets o valores por defecto)"""
+    fuentes = []
+    for i, fuente in enumerate(leer_secret("fuentes", fuentes_default), start=1):
+        try:
+            fuente = dict(fuente)
+        except (TypeError, ValueError):
+            st.error(f"Fuente #{i} inválida en secrets: debe ser una tabla [[fuentes]]")
+            continue
+        faltantes = [clave for clave in claves_fuente if clave not in fuente]
+        if faltantes:
+            st.error(f"Fuente #{i} inválida en secrets: faltan las claves {', '.join(faltantes)}")
+            continue
+        if not isinstance(fuente['planta'], str) or fuente['planta'].strip() == '':
+            st.error(f"Fuente #{i} inválida en secrets: 'planta' debe ser un texto no vacío")
+            continue
+        # La planta forma parte de la clave de cada OT, por lo que debe ser única
+        if fuente['planta'] in [otra['planta'] for otra in fuentes]:
+            st.error(f"Fuente #{i} inválida en secrets: la planta '{fuente['planta']}' está repetida (usa un nombre distinto por planta/línea)")
+            continue
+        fuentes.append(fuente)
+    return fuentes
+
+def cargar_fuente(fuente):
+    """Cargar OT Master y Procesos de una fuente y etiquetar sus filas con la planta"""
+    # URLs - formato de exportación directa
+    base_csv = f"https://docs.google.com/spreadsheets/d/{fuente['sheet_id']}/export?format=csv&gid="
+    # La OT se lee como texto: una celda vacía no debe convertir la columna en float ("123.0")
+    ot_master = pd.read_csv(base_csv + str(fuente['gid_ot_master']), dtype={'ot': str})
+    procesos = pd.read_csv(base_csv + str(fuente['gid_procesos']), dtype={'ot': str})
+    
+    for df in (ot_master, procesos):
+        df['fila'] = df.index + 2  # Fila en la hoja (encabezado + base 1)
+        df['planta'] = fuente['planta']
+        # Las OTs se identifican por planta para evitar choques entre libros
+        df['ot_origen'] = df['ot'].fillna('').str.strip()
+        df['ot'] = fuente['planta'] + ':' + df['ot_origen']
+    
+    return ot_master, procesos
+
+def vista_usuario(df, incluir_fila=False):
+    """Mostrar la OT original de la hoja en lugar de la clave interna 'planta:ot'"""
+    columnas_internas = ['ot_origen'] if incluir_fila else ['ot_origen', 'fila']
+    return df.assign(ot=df['ot_origen']).drop(columns=columnas_internas)
+
+@st.cache_data(ttl=300, show_spinner="Cargando datos desde Google Sheets...")
+def load_data(fuentes):
+    """Cargar en paralelo los datos de todas las fuentes desde Google Sheets"""
+    ot_masters = []
+    procesos_fuentes = []
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(fuentes)))) as executor:
+        futuros = [executor.submit(cargar_fuente, fuente) for fuente in fuentes]
+        for fuente, futuro in zip(fuentes, futuros):
+            try:
+                ot_master_fuente, procesos_fuente = futuro.result()
+                ot_masters.append(ot_master_fuente)
+                procesos_fuentes.append(procesos_fuente)
+            except Exception as e:
+                st.error(f"Error al cargar los datos de '{fuente.get('planta', '?')}' desde Google Sheets: {e}")
+    
+    if not ot_masters:
+        return None, None, None
+    
+    ot_master = pd.concat(ot_masters, ignore_index=True)
+    procesos = pd.concat(procesos_fuentes, ignore_index=True)
+    
+    # Versión de los datos: cambia solo cuando se vuelven a descargar
+    version_datos = datetime.now().isoformat()
+    
+    return ot_master, procesos, version_datos
+
+# Columnas de fechas y horas por hoja
+date_columns = ['fecha_entrega', 'fecha_impresion', 'fecha_terminado', 'fecha_entregada']
+date_columns_procesos = ['fecha_inicio_1', 'fecha_inicio_2']
+hour_columns = ['horas_estimadas_ot', 'horas_reales_ot']
+hour_columns_procesos = ['horas_estimadas', 'horas_reales']
+
+def revisar_fechas(df, columnas):
+    """Marcar fechas con valor que no se puede interpretar como fecha"""
+    checks = {}
+    for col in columnas:
+        if col in df.columns:
+            presente = df[col].notna() & (df[col].astype(str).str.strip() != '')
+            checks[f"Fecha inválida en '{col}'"] = presente & pd.to_datetime(df[col], errors='coerce').isna()
+    return checks
+
+def revisar_horas(df, columnas):
+    """Marcar horas no numéricas o negativas"""
+    checks = {}
+    for col in columnas:
+        if col in df.columns:
+            numerico = pd.to_numeric(df[col], errors='coerce')
+            checks[f"Horas no numéricas en '{col}'"] = df[col].notna() & numerico.isna()
+            checks[f"Horas negativas en '{col}'"] = numerico < 0
+    return checks
+
+def separar_cuarentena(df, hoja, checks):
+    """Separar las filas que fallan alguna validación, indicando todos sus motivos"""
+    motivos = pd.Series('', index=df.index)
+    for motivo, mask in checks.items():
+        motivos = motivos.where(~mask, motivos + motivo + '; ')
+    invalidas = motivos != ''
+    cuarentena = df[invalidas].copy()
+    cuarentena['motivo'] = motivos[invalidas].str.rstrip('; ')
+    cuarentena['hoja'] = hoja
+    columnas_primero = ['planta', 'hoja', 'fila', 'motivo']
+    cuarentena = cuarentena[columnas_primero + [col for col in cuarentena.columns if col not in columnas_primero]]
+    return df[~invalidas].copy(), cuarentena
+
+@st.cache_data(max_entries=5, show_spinner="Validando calidad de datos...")
+def validar_datos(_ot_master, _procesos, version_datos, estatus_validos):
+    """Validar ambas hojas y enviar las filas inválidas a cuarentena (cacheado por versión de datos)"""
+    checks_ot = {}
+    checks_ot.update(revisar_fechas(_ot_master, date_columns))
+    checks_ot.update(revisar_horas(_ot_master, hour_columns))
+    checks_ot['OT vacía'] = _ot_master['ot_origen'] == ''
+    if 'estatus' in _ot_master.columns:
+        checks_ot['Estatus desconocido'] = _ot_master['estatus'].notna() & ~_ot_master['estatus'].isin(estatus_validos)
+    ot_master_valido, cuarentena_ot = separar_cuarentena(_ot_master, 'OT Master', checks_ot)
+    
+    # Duplicados solo entre filas válidas: se conserva la primera copia válida de cada OT
+    checks_duplicados = {'OT duplicada': ot_master_valido['ot'].duplicated(keep='first')}
+    ot_master_valido, cuarentena_duplicados = separar_cuarentena(ot_master_valido, 'OT Master', checks_duplicados)
+    cuarentena_ot = pd.concat([cuarentena_ot, cuarentena_duplicados]).sort_index()
+    
+    # Procesos se valida contra las OTs que pasaron la validación de OT Master
+    checks_procesos = {}
+    checks_procesos.update(revisar_fechas(_procesos, date_columns_procesos))
+    checks_procesos.update(revisar_horas(_procesos, hour_columns_procesos))
+    ot_vacia = _procesos['ot_origen'] == ''
+    checks_procesos['OT vacía'] = ot_vacia
+    checks_procesos['OT no existe en OT Master'] = ~ot_vacia & ~_procesos['ot'].isin(_ot_master['ot'])
+    checks_procesos['OT en cuarentena en OT Master'] = ~ot_vacia & _procesos['ot'].isin(_ot_master['ot']) & ~_procesos['ot'].isin(ot_master_valido['ot'])
+    procesos_validos, cuarentena_procesos = separar_cuarentena(_procesos, 'Procesos', checks_procesos)
+    cuarentena = pd.concat([cuarentena_ot, cuarentena_procesos], ignore_index=True)
+    
+    return ot_master_valido, procesos_validos, cuarentena
+
+# Forzar la recarga desde Google Sheets sin esperar el vencimiento del cache
+if st.sidebar.button("🔄 Recargar datos", use_container_width=True):
+    load_data.clear()
+    st.rerun()
 
 # Cargar datos con spinner
 with st.spinner("Cargando datos desde Google Sheets..."):
-    ot_master, procesos = load_data()
+    ot_master, procesos, version_datos = load_data(obtener_fuentes())
 
 if ot_master is None or procesos is None:
     st.error("No se pudieron cargar los datos. Por favor, verifica la conexión e intenta nuevamente.")
     st.stop()
 
-# Asegurar que la columna 'ot' sea string en ambos dataframes
-ot_master['ot'] = ot_master['ot'].astype(str)
-procesos['ot'] = procesos['ot'].astype(str)
+# Validar calidad de datos y separar filas inválidas
+ot_master, procesos, cuarentena = validar_datos(ot_master, procesos, version_datos, estatus_validos)
+if not cuarentena.empty:
+    st.warning(f"⚠️ {len(cuarentena)} filas enviadas a cuarentena por problemas de calidad de datos. Revisa la pestaña 'Cuarentena' en Datos Detallados.")
 
 # Sidebar con filtros
 st.sidebar.header("🔍 Filtros")
 
-# Convertir fechas en ot_master
-date_columns = ['fecha_entrega', 'fecha_impresion', 'fecha_terminado', 'fecha_entregada']
+# Convertir fechas y horas en ot_master
 for col in date_columns:
     if col in ot_master.columns:
         ot_master[col] = pd.to_datetime(ot_master[col], errors='coerce')
+for col in hour_columns:
+    if col in ot_master.columns:
+        ot_master[col] = pd.to_numeric(ot_master[col], errors='coerce')
 
-# Convertir fechas en procesos
-date_columns_procesos = ['fecha_inicio_1', 'fecha_inicio_2']
+# Convertir fechas y horas en procesos
 for col in date_columns_procesos:
     if col in procesos.columns:
         procesos[col] = pd.to_datetime(procesos[col], errors='coerce')
+for col in hour_columns_procesos:
+    if col in procesos.columns:
+        procesos[col] = pd.to_numeric(procesos[col], errors='coerce')
 
 # Filtros principales
+plantas = ['Todas'] + sorted(ot_master['planta'].dropna().unique().tolist())
+planta_seleccionada = st.sidebar.selectbox("Planta", plantas)
+
 clientes = ['Todos'] + sorted(ot_master['cliente'].dropna().unique().tolist())
 cliente_seleccionado = st.sidebar.selectbox("Cliente", clientes)
 
 estatus_options = ['Todos'] + sorted(ot_master['estatus'].dropna().unique().tolist())
 estatus_seleccionado = st.sidebar.selectbox("Estatus", estatus_options)
 
-# Filtro de OT
-ots = ["Todas"] + sorted(ot_master['ot'].astype(str).unique().tolist())
-ot_seleccionada = st.sidebar.selectbox("OT", ots)
+# Filtro de OT ('ot' es la clave interna; se muestra la OT original de la hoja)
+varias_plantas = ot_master['planta'].nunique() > 1
+etiquetas = ot_master['ot_origen']
+if varias_plantas:
+    etiquetas = etiquetas + ' (' + ot_master['planta'] + ')'
+etiquetas_ot = dict(zip(ot_master['ot'], etiquetas))
+ots = ["Todas"] + sorted(ot_master['ot'].unique().tolist())
+ot_seleccionada = st.sidebar.selectbox("OT", ots, format_func=lambda ot: etiquetas_ot.get(ot, ot))
 
 # Filtros de empleados SIN REPETIDOS
 st.sidebar.subheader("👥 Filtros por Empleados")
@@ -155,6 +325,10 @@ else:
 ot_master_filtrado = ot_master.copy()
 procesos_filtrados = procesos.copy()
 
+if planta_seleccionada != 'Todas':
+    ot_master_filtrado = ot_master_filtrado[ot_master_filtrado['planta'] == planta_seleccionada]
+    procesos_filtrados = procesos_filtrados[procesos_filtrados['planta'] == planta_seleccionada]
+
 if cliente_seleccionado != 'Todos':
     ot_master_filtrado = ot_master_filtrado[ot_master_filtrado['cliente'] == cliente_seleccionado]
     procesos_filtrados = procesos_filtrados[procesos_filtrados['ot'].isin(ot_master_filtrado['ot'])]
@@ -185,9 +359,6 @@ if fecha_inicio and fecha_fin:
     ]
     procesos_filtrados = procesos_filtrados[procesos_filtrados['ot'].isin(ot_master_filtrado['ot'])]
 
-# Definir estados que NO se consideran vencidos
-estados_no_vencidos = ['FACTURADO', 'OK', 'OK NO ENTREGADO']
-
 # Calcular OTs vencidas y por vencer
 hoy = datetime.now()
 ot_master_filtrado['estado_entrega'] = ot_master_filtrado.apply(
@@ -199,21 +370,14 @@ ot_master_filtrado['estado_entrega'] = ot_master_filtrado.apply(
     axis=1
 )
 
-# Calcular porcentaje de facturación
-total_ots = len(ot_master_filtrado)
-ots_facturadas = len(ot_master_filtrado[ot_master_filtrado['estatus'] == 'FACTURADO'])
-porcentaje_facturado = (ots_facturadas / total_ots * 100) if total_ots > 0 else 0
-
 # Identificar reprocesos (Garantías)
 if 'orden_compra' in ot_master_filtrado.columns:
     ot_master_filtrado['es_reproceso'] = ot_master_filtrado['orden_compra'].str.contains('GARANTIA', case=False, na=False)
-    total_reprocesos = ot_master_filtrado['es_reproceso'].sum()
-    porcentaje_reprocesos = (total_reprocesos / total_ots * 100) if total_ots > 0 else 0
 else:
-    total_reprocesos = 0
-    porcentaje_reprocesos = 0
+    ot_master_filtrado['es_reproceso'] = False
 
 # Calcular desviaciones de horas
+ot_con_horas = pd.DataFrame(columns=['planta', 'horas_estimadas_ot', 'horas_reales_ot', 'diferencia_horas'])
 ots_desviacion_positiva = pd.DataFrame()
 ots_desviacion_negativa = pd.DataFrame()
 
@@ -233,21 +397,66 @@ if 'horas_estimadas_ot' in ot_master_filtrado.columns and 'horas_reales_ot' in o
     # Separar en DataFrames para desviaciones positivas y negativas
     ots_desviacion_positiva = ot_con_horas[ot_con_horas['tipo_desviacion'] == 'Desviación Positiva'].copy()
     ots_desviacion_negativa = ot_con_horas[ot_con_horas['tipo_desviacion'] == 'Desviación Negativa'].copy()
+
+def kpis_parciales(ot_master_df, ot_con_horas_df):
+    """Calcular agregados parciales por planta (conteos y sumas que se pueden combinar)"""
+    activas = ~ot_master_df['estatus'].isin(estados_no_vencidos)
+    conteos = pd.DataFrame({
+        'planta': ot_master_df['planta'],
+        'total_ots': 1,
+        'ots_en_proceso': ot_master_df['estatus'] == 'EN PROCESO',
+        'ots_facturadas': ot_master_df['estatus'] == 'FACTURADO',
+        'ots_vencidas': (ot_master_df['estado_entrega'] == 'Vencida') & activas,
+        'ots_por_vencer': (ot_master_df['estado_entrega'] == 'Por vencer') & activas,
+        'total_reprocesos': ot_master_df['es_reproceso'],
+    }).groupby('planta').sum()
     
-    # Calcular totales
-    total_horas_programadas = ot_con_horas['horas_estimadas_ot'].sum()
-    horas_desviacion_positiva = ots_desviacion_positiva['horas_reales_ot'].sum()
-    horas_desviacion_negativa = ots_desviacion_negativa['horas_reales_ot'].sum()
+    positiva = ot_con_horas_df['diferencia_horas'] <= 0
+    horas = pd.DataFrame({
+        'planta': ot_con_horas_df['planta'],
+        'total_horas_programadas': ot_con_horas_df['horas_estimadas_ot'],
+        'horas_desviacion_positiva': ot_con_horas_df['horas_reales_ot'].where(positiva, 0),
+        'horas_desviacion_negativa': ot_con_horas_df['horas_reales_ot'].where(~positiva, 0),
+    }).groupby('planta').sum()
     
-    # Calcular porcentajes
-    porcentaje_positivo = (horas_desviacion_positiva / total_horas_programadas * 100) if total_horas_programadas > 0 else 0
-    porcentaje_negativo = (horas_desviacion_negativa / total_horas_programadas * 100) if total_horas_programadas > 0 else 0
-else:
-    total_horas_programadas = 0
-    horas_desviacion_positiva = 0
-    horas_desviacion_negativa = 0
-    porcentaje_positivo = 0
-    porcentaje_negativo = 0
+    return conteos.join(horas, how='outer').fillna(0)
+
+# KPIs por planta y totales combinados a partir de los agregados parciales
+kpis_por_planta = kpis_parciales(ot_master_filtrado, ot_con_horas)
+kpis_totales = kpis_por_planta.sum()
+
+total_ots = int(kpis_totales.get('total_ots', 0))
+ots_en_proceso = int(kpis_totales.get('ots_en_proceso', 0))
+ots_facturadas = int(kpis_totales.get('ots_facturadas', 0))
+ots_vencidas = int(kpis_totales.get('ots_vencidas', 0))
+ots_por_vencer = int(kpis_totales.get('ots_por_vencer', 0))
+total_reprocesos = int(kpis_totales.get('total_reprocesos', 0))
+total_horas_programadas = float(kpis_totales.get('total_horas_programadas', 0))
+horas_desviacion_positiva = float(kpis_totales.get('horas_desviacion_positiva', 0))
+horas_desviacion_negativa = float(kpis_totales.get('horas_desviacion_negativa', 0))
+
+# Calcular porcentajes
+porcentaje_facturado = (ots_facturadas / total_ots * 100) if total_ots > 0 else 0
+porcentaje_reprocesos = (total_reprocesos / total_ots * 100) if total_ots > 0 else 0
+porcentaje_positivo = (horas_desviacion_positiva / total_horas_programadas * 100) if total_horas_programadas > 0 else 0
+porcentaje_negativo = (horas_desviacion_negativa / total_horas_programadas * 100) if total_horas_programadas > 0 else 0
+
+# Tabla por planta con las mismas etiquetas que el resumen ejecutivo
+tabla_plantas = kpis_por_planta.copy()
+tabla_plantas['% Facturación'] = (tabla_plantas['ots_facturadas'] / tabla_plantas['total_ots'] * 100).round(1)
+tabla_plantas['% Reprocesos'] = (tabla_plantas['total_reprocesos'] / tabla_plantas['total_ots'] * 100).round(1)
+tabla_plantas = tabla_plantas.rename(columns={
+    'total_ots': 'Total OTs',
+    'ots_en_proceso': 'OTs en Proceso',
+    'ots_facturadas': 'OTs Facturadas',
+    'ots_vencidas': 'OTs Vencidas',
+    'ots_por_vencer': 'OTs por Vencer',
+    'total_reprocesos': 'Reprocesos',
+    'total_horas_programadas': 'Horas Programadas Totales',
+    'horas_desviacion_positiva': 'Desviaciones Positivas (h)',
+    'horas_desviacion_negativa': 'Desviaciones Negativas (h)',
+})
+tabla_plantas.index.name = 'Planta'
 
 # Métricas principales
 st.header("📊 Métricas Principales")
@@ -255,19 +464,21 @@ col1, col2, col3, col4, col5, col6 = st.columns(6)
 with col1: 
     st.metric("Total OTs", total_ots)
 with col2: 
-    ots_en_proceso = len(ot_master_filtrado[ot_master_filtrado['estatus'] == 'EN PROCESO'])
     st.metric("OTs en Proceso", ots_en_proceso)
 with col3:
     st.metric("OTs Facturadas", ots_facturadas, f"{porcentaje_facturado:.1f}%")
 with col4: 
-    ots_vencidas = len(ot_master_filtrado[(ot_master_filtrado['estado_entrega'] == 'Vencida') & (~ot_master_filtrado['estatus'].isin(estados_no_vencidos))])
     st.metric("OTs Vencidas", ots_vencidas, delta=-ots_vencidas, delta_color="inverse")
 with col5: 
-    ots_por_vencer = len(ot_master_filtrado[(ot_master_filtrado['estado_entrega'] == 'Por vencer') & (~ot_master_filtrado['estatus'].isin(estados_no_vencidos))])
     st.metric("OTs por Vencer", ots_por_vencer, delta=ots_por_vencer, delta_color="off")
 with col6:
     st.metric("Reprocesos", total_reprocesos, f"{porcentaje_reprocesos:.1f}%")
 
+# Métricas por planta (solo si hay más de una fuente en los datos filtrados)
+if len(kpis_por_planta) > 1:
+    with st.expander("🏭 Métricas por Planta"):
+        st.dataframe(tabla_plantas, use_container_width=True)
+
 # =============================================
 # SECCIÓN DE EXPORTACIÓN (COLOCADA AQUÍ PARA MAYOR VISIBILIDAD)
 # =============================================
@@ -442,7 +653,8 @@ def exportar_a_powerpoint():
             top_ots = ots_desviacion_negativa.nlargest(5, 'diferencia_horas')
             texto_ots = "Principales OTs con desviaciones:\n\n"
             for idx, row in top_ots.iterrows():
-                texto_ots += f"• OT {row['ot']}: {row['diferencia_horas']:.1f}h (Cliente: {row.get('cliente', 'N/A')})\n"
+                etiqueta_ot = f"{row['ot_origen']} ({row['planta']})" if varias_plantas else row['ot_origen']
+                texto_ots += f"• OT {etiqueta_ot}: {row['diferencia_horas']:.1f}h (Cliente: {row.get('cliente', 'N/A')})\n"
             
             text_frame.text = texto_ots
         
@@ -577,11 +789,11 @@ def exportar_a_excel():
         # Crear un escritor de Excel
         with pd.ExcelWriter('reporte_adimatec.xlsx', engine='openpyxl') as writer:
             # Hoja 1: OT Master
-            ot_master_filtrado.to_excel(writer, sheet_name='OT_Master', index=False)
+            vista_usuario(ot_master_filtrado).to_excel(writer, sheet_name='OT_Master', index=False)
             
             # Hoja 2: Procesos
             if not procesos_filtrados.empty:
-                procesos_filtrados.to_excel(writer, sheet_name='Procesos', index=False)
+                vista_usuario(procesos_filtrados).to_excel(writer, sheet_name='Procesos', index=False)
             
             # Hoja 3: Resumen Ejecutivo
             resumen_data = {
@@ -612,12 +824,15 @@ def exportar_a_excel():
             }
             pd.DataFrame(resumen_data).to_excel(writer, sheet_name='Resumen', index=False)
             
-            # Hoja 4: OTs Críticas
+            # Hoja 4: Resumen por Planta
+            tabla_plantas.to_excel(writer, sheet_name='Por_Planta')
+            
+            # Hoja 5: OTs Críticas
             if not ots_desviacion_negativa.empty:
-                columnas_criticas = ['ot', 'cliente', 'horas_estimadas_ot', 'horas_reales_ot', 'diferencia_horas']
+                columnas_criticas = ['planta', 'ot', 'cliente', 'horas_estimadas_ot', 'horas_reales_ot', 'diferencia_horas']
                 columnas_disponibles = [col for col in columnas_criticas if col in ots_desviacion_negativa.columns]
                 if columnas_disponibles:
-                    ots_desviacion_negativa[columnas_disponibles].to_excel(writer, sheet_name='OTs_Criticas', index=False)
+                    vista_usuario(ots_desviacion_negativa)[columnas_disponibles].to_excel(writer, sheet_name='OTs_Criticas', index=False)
         
         # Ofrecer descarga
         with open('reporte_adimatec.xlsx', 'rb') as f:
@@ -643,14 +858,14 @@ def exportar_a_excel():
 # Tablas de datos
 st.markdown("---")
 st.header("📋 Datos Detallados")
-tab1, tab2 = st.tabs(["OT Master", "Procesos"])
+tab1, tab2, tab3 = st.tabs(["OT Master", "Procesos", "Cuarentena"])
 with tab1:
     st.subheader("Tabla OT Master")
-    columnas_mostrar = ['ot', 'descripcion', 'cliente', 'estatus', 'fecha_entrega', 'horas_estimadas_ot', 'horas_reales_ot']
+    columnas_mostrar = ['planta', 'ot', 'descripcion', 'cliente', 'estatus', 'fecha_entrega', 'horas_estimadas_ot', 'horas_reales_ot']
     columnas_disponibles = [col for col in columnas_mostrar if col in ot_master_filtrado.columns]
     if not ot_master_filtrado.empty:
-        st.dataframe(ot_master_filtrado[columnas_disponibles], use_container_width=True, hide_index=True)
-        csv_ot = ot_master_filtrado.to_csv(index=False)
+        st.dataframe(vista_usuario(ot_master_filtrado)[columnas_disponibles], use_container_width=True, hide_index=True)
+        csv_ot = vista_usuario(ot_master_filtrado).to_csv(index=False)
         st.download_button(label="📥 Descargar OT Master como CSV", data=csv_ot, file_name="ot_master_filtrado.csv", mime="text/csv")
     else: 
         st.info("No hay datos para mostrar en OT Master")
@@ -662,14 +877,23 @@ with tab2:
         if nombre in procesos_filtrados.columns:
             columna_proceso = nombre
             break
-    columnas_mostrar_procesos = ['ot', columna_proceso, 'horas_estimadas', 'horas_reales', 'empleado_1', 'empleado_2']
+    columnas_mostrar_procesos = ['planta', 'ot', columna_proceso, 'horas_estimadas', 'horas_reales', 'empleado_1', 'empleado_2']
     columnas_disponibles_procesos = [col for col in columnas_mostrar_procesos if col in procesos_filtrados.columns]
     if not procesos_filtrados.empty:
-        st.dataframe(procesos_filtrados[columnas_disponibles_procesos], use_container_width=True, hide_index=True)
-        csv_procesos = procesos_filtrados.to_csv(index=False)
+        st.dataframe(vista_usuario(procesos_filtrados)[columnas_disponibles_procesos], use_container_width=True, hide_index=True)
+        csv_procesos = vista_usuario(procesos_filtrados).to_csv(index=False)
         st.download_button(label="📥 Descargar Procesos como CSV", data=csv_procesos, file_name="procesos_filtrados.csv", mime="text/csv")
     else: 
         st.info("No hay datos para mostrar en Procesos")
+with tab3:
+    st.subheader("Filas en Cuarentena")
+    st.caption("Filas excluidas del análisis por problemas de calidad de datos")
+    if not cuarentena.empty:
+        st.dataframe(vista_usuario(cuarentena, incluir_fila=True), use_container_width=True, hide_index=True)
+        csv_cuarentena = vista_usuario(cuarentena, incluir_fila=True).to_csv(index=False)
+        st.download_button(label="📥 Descargar Cuarentena como CSV", data=csv_cuarentena, file_name="cuarentena.csv", mime="text/csv")
+    else: 
+        st.success("✅ Todas las filas pasaron la validación")
 
 # Footer
 st.markdown("---")